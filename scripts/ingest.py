@@ -9,6 +9,8 @@ scripts/ingest.py
   python scripts/ingest.py --id ada_2026          # 只更新特定來源
   python scripts/ingest.py --changed              # 只更新 hash 有變動的
   python scripts/ingest.py --dry-run             # 只顯示會做什麼，不實際抓取
+
+type: pdf 來源的 url 可以是 http(s)、file:// 或相對於專案根目錄的本機路徑。
 """
 
 import argparse
@@ -16,8 +18,12 @@ import hashlib
 import json
 import time
 import re
+from concurrent.futures import ProcessPoolExecutor, as_completed
 from datetime import datetime, timezone
+from email.utils import formatdate, parsedate_to_datetime
 from pathlib import Path
+from urllib.parse import urlparse
+from urllib.request import url2pathname
 
 import yaml
 import requests
@@ -27,8 +33,12 @@ from bs4 import BeautifulSoup
 ROOT = Path(__file__).parent.parent
 DATA_DIR = ROOT / "data"
 RAW_DIR = DATA_DIR / "raw"
+PROCESSED_DIR = DATA_DIR / "processed"
 SOURCES_FILE = DATA_DIR / "sources" / "urls.yaml"
 HASH_CACHE = DATA_DIR / ".hash_cache.json"
+RSS_STATE_DIR = DATA_DIR / "rss_state"           # RSS 已看過的項目（commit 進 repo，跨次執行保留）
+PDF_DIR = DATA_DIR / "pdf"                       # 下載回來的 PDF 原檔
+PAGE_CACHE_DIR = DATA_DIR / ".pdf_page_cache"    # 每頁文字快取，檔名 = 頁面內容 hash
 
 HEADERS = {
     "User-Agent": "ClinCalc-Bot/1.0 (Medical knowledge aggregator; contact: your@email.com)",
@@ -37,6 +47,12 @@ HEADERS = {
 }
 REQUEST_DELAY = 2.0    # 兩次請求之間至少等幾秒（避免對來源伺服器造成負擔）
 REQUEST_TIMEOUT = 30
+RSS_MAX_ITEMS = 200    # 每個 RSS 來源最多保留幾則（可在 urls.yaml 用 rss_max_items 覆寫）
+RSS_MAX_AGE_DAYS = 365 # 超過幾天的 RSS 項目會被淘汰（可用 rss_max_age_days 覆寫）
+PDF_STREAM_CHUNK = 64 * 1024   # PDF 串流下載每次寫入的位元組數
+PDF_PAGE_BATCH = 8             # 每個 worker 一次擷取幾頁
+PDF_WORKERS = None             # ProcessPool 大小（None = CPU 核心數）
+PDF_EXTRACTOR_REV = 1          # 頁面文字的擷取/清理邏輯變更時遞增，讓舊快取失效
 
 
 # ─── 主流程 ──────────────────────────────────────────────────────
@@ -66,17 +82,34 @@ def main():
 
         try:
             result = fetch_source(source)
-            new_hash = compute_hash(result["text"])
-
-            if args.changed and hash_cache.get(sid) == new_hash:
+            if "items" in result:
+                # RSS：與上次的項目合併，hash 只看 GUID 集合
+                new_count = merge_rss_items(result, load_rss_state(sid), source)
+                new_hash = compute_hash("\n".join(it["guid"] for it in result["items"]))
+            elif "pages" in result:
+                # PDF：hash 由各頁內容 hash 組成
+                new_hash = compute_hash("\n".join(p["hash"] for p in result["pages"]))
+            else:
+                new_hash = compute_hash(result["text"])
+
+            # 沒有 processed 輸出的來源即使 hash 相同也要重存，否則會從索引中消失
+            processed_exists = (PROCESSED_DIR / f"{sid}.json").exists()
+            if args.changed and hash_cache.get(sid) == new_hash and processed_exists:
                 print(f"  → 無變動，略過")
                 skipped.append(sid)
                 continue
 
             save_raw(sid, result)
+            if "items" in result:
+                save_rss_state(sid, result["items"])
             hash_cache[sid] = new_hash
             updated.append(sid)
-            print(f"  ✓ 已儲存 ({len(result['text'])} 字元)")
+            if "items" in result:
+                print(f"  ✓ 已儲存 ({len(result['items'])} 則，新增 {new_count} 則)")
+            elif "pages" in result:
+                print(f"  ✓ 已儲存 ({len(result['pages'])} 頁)")
+            else:
+                print(f"  ✓ 已儲存 ({len(result['text'])} 字元)")
 
         except Exception as e:
             print(f"  ✗ 失敗：{e}")
@@ -103,22 +136,34 @@ def fetch_source(source: dict) -> dict:
     src_type = source.get("type", "html")
     license_ = source.get("license", "public_summary")
 
-    resp = requests.get(url, headers=HEADERS, timeout=REQUEST_TIMEOUT)
-    resp.raise_for_status()
-    resp.encoding = resp.apparent_encoding or "utf-8"
-
-    if src_type == "rss":
-        text = parse_rss(resp.text)
-    elif src_type == "pdf":
-        text = "[PDF] 請手動下載並轉換：" + url
+    items = None
+    pages = None
+    if src_type == "pdf":
+        # PDF 串流到磁碟、逐頁擷取；文字存在頁面快取，不放進 raw JSON
+        text = ""
+        http_status = None
+        if license_ != "restricted":
+            pdf_path, http_status = download_pdf(source)
+            pages = extract_pdf_pages(pdf_path)
     else:
-        text = parse_html(resp.text, source)
+        resp = requests.get(url, headers=HEADERS, timeout=REQUEST_TIMEOUT)
+        resp.raise_for_status()
+        resp.encoding = resp.apparent_encoding or "utf-8"
+        http_status = resp.status_code
+
+        if src_type == "rss":
+            items = parse_rss(resp.text)
+            text = ""
+        else:
+            text = parse_html(resp.text, source)
 
     # 著作權合規：restricted 來源只保留 URL + 標題
     if license_ == "restricted":
         text = f"[RESTRICTED] 此來源受版權保護，請直接訪問原始頁面：{url}"
+        items = None
+        pages = None
 
-    return {
+    result = {
         "id": source["id"],
         "title": source["title"],
         "url": url,
@@ -128,8 +173,13 @@ def fetch_source(source: dict) -> dict:
         "license": license_,
         "text": text,
         "fetched_at": datetime.now(timezone.utc).isoformat(),
-        "http_status": resp.status_code,
+        "http_status": http_status,
     }
+    if items is not None:
+        result["items"] = items
+    if pages is not None:
+        result["pages"] = pages
+    return result
 
 
 def parse_html(raw_html: str, source: dict) -> str:
@@ -162,26 +212,232 @@ def parse_html(raw_html: str, source: dict) -> str:
     return clean_text(body.get_text() if body else soup.get_text())
 
 
-def parse_rss(raw_xml: str) -> str:
-    """解析 RSS，回傳標題 + 摘要列表"""
+def parse_rss(raw_xml: str) -> list[dict]:
+    """解析 RSS，每則 item 回傳一筆獨立記錄（以 guid / link 為鍵）"""
     soup = BeautifulSoup(raw_xml, "xml")
-    items = soup.find_all("item")[:20]  # 最多 20 篇
-    lines = []
-    for item in items:
+    items = []
+    for item in soup.find_all("item"):
         title = item.find("title")
         desc = item.find("description") or item.find("summary")
         link = item.find("link")
         pub = item.find("pubDate")
-        if title:
-            lines.append(f"## {title.get_text(strip=True)}")
-        if pub:
-            lines.append(f"發布：{pub.get_text(strip=True)}")
-        if desc:
-            lines.append(clean_text(desc.get_text())[:500])
-        if link:
-            lines.append(f"來源：{link.get_text(strip=True)}")
-        lines.append("")
-    return "\n".join(lines)
+        guid = item.find("guid")
+        record = {
+            "title": title.get_text(strip=True) if title else "",
+            "link": link.get_text(strip=True) if link else "",
+            "published": pub.get_text(strip=True) if pub else "",
+            "summary": clean_text(desc.get_text())[:500] if desc else "",
+        }
+        # guid 優先，其次 link，都沒有時用標題 + 發布時間 + 摘要；全空的項目沒有穩定鍵，略過
+        fallback = "\n".join([record["title"], record["published"], record["summary"]])
+        if not fallback.strip():
+            fallback = ""
+        record["guid"] = (
+            (guid.get_text(strip=True) if guid else "")
+            or record["link"]
+            or (compute_hash(fallback) if fallback else "")
+        )
+        if record["guid"]:
+            items.append(record)
+    return items
+
+
+def merge_rss_items(result: dict, previous: list[dict], source: dict) -> int:
+    """
+    將本次抓到的 RSS 項目與上次保留的項目合併（就地更新 result["items"]）。
+    已看過的 guid 沿用舊記錄，只有新項目會帶新的 first_seen；
+    回傳實際新增的項目數。
+    """
+    seen = {it["guid"]: it for it in previous}
+    fresh = []
+    fresh_guids = set()
+    for it in result["items"]:
+        if it["guid"] in seen or it["guid"] in fresh_guids:
+            continue
+        it["first_seen"] = result["fetched_at"]
+        fresh.append(it)
+        fresh_guids.add(it["guid"])
+
+    kept = prune_rss_items(fresh + list(seen.values()), source)
+    result["items"] = kept
+    kept_guids = {it["guid"] for it in kept}
+    return sum(1 for it in fresh if it["guid"] in kept_guids)
+
+
+def prune_rss_items(items: list[dict], source: dict) -> list[dict]:
+    """依年齡與數量上限淘汰舊項目（items 需為新→舊排序）"""
+    max_items = source.get("rss_max_items", RSS_MAX_ITEMS)
+    max_age = source.get("rss_max_age_days", RSS_MAX_AGE_DAYS)
+    now = datetime.now(timezone.utc)
+
+    kept = []
+    for it in items:
+        ts = item_timestamp(it)
+        if ts and (now - ts).days > max_age:
+            continue
+        kept.append(it)
+    return kept[:max_items]
+
+
+def item_timestamp(item: dict) -> datetime | None:
+    """RSS 項目的時間：優先 pubDate，解析失敗時退回 first_seen"""
+    try:
+        ts = parsedate_to_datetime(item.get("published", ""))
+    except (TypeError, ValueError):
+        ts = None
+    if ts is None and item.get("first_seen"):
+        ts = datetime.fromisoformat(item["first_seen"])
+    if ts is not None and ts.tzinfo is None:
+        ts = ts.replace(tzinfo=timezone.utc)
+    return ts
+
+
+def download_pdf(source: dict) -> tuple[Path, int | None]:
+    """
+    取得 PDF 檔案路徑。本機路徑 / file:// 直接使用（離線可用）；
+    http(s) 以串流方式寫入 data/pdf/，不把整份檔案讀進記憶體。
+    已下載過的檔案會帶 If-Modified-Since，伺服器回 304 時沿用舊檔。
+    """
+    url = source["url"]
+
+    # 先認本機路徑（Windows 的 C:\... 會被 urlparse 當成 scheme "c"）
+    local = Path(url)
+    if not local.is_absolute():
+        local = ROOT / local
+    if local.is_file():
+        return local, None
+
+    parsed = urlparse(url)
+    if parsed.scheme == "file":
+        local = Path(url2pathname(parsed.path))
+        if not local.is_file():
+            raise FileNotFoundError(f"找不到 PDF：{local}")
+        return local, None
+    if parsed.scheme not in ("http", "https"):
+        raise FileNotFoundError(f"找不到 PDF：{url}")
+
+    PDF_DIR.mkdir(parents=True, exist_ok=True)
+    out_path = PDF_DIR / f"{source['id']}.pdf"
+    tmp_path = out_path.with_suffix(".pdf.part")
+    headers = {**HEADERS, "Accept": "application/pdf"}
+    if out_path.exists():
+        headers["If-Modified-Since"] = formatdate(out_path.stat().st_mtime, usegmt=True)
+
+    try:
+        with requests.get(url, headers=headers, timeout=REQUEST_TIMEOUT, stream=True) as resp:
+            resp.raise_for_status()
+            if resp.status_code == 304:
+                print("  → PDF 未變動，沿用已下載檔案")
+                return out_path, resp.status_code
+
+            with open(tmp_path, "wb") as f:
+                for block in resp.iter_content(chunk_size=PDF_STREAM_CHUNK):
+                    f.write(block)
+            status = resp.status_code
+            content_type = resp.headers.get("Content-Type", "").split(";")[0].strip().lower()
+
+        # 以檔頭判斷是否為 PDF（S3/CDN 常回 octet-stream），Content-Type 只用於錯誤訊息
+        with open(tmp_path, "rb") as f:
+            head = f.read(1024)
+        if b"%PDF-" not in head:
+            raise ValueError(f"下載內容不是 PDF（Content-Type: {content_type or '未知'}，可能是錯誤頁或登入頁）")
+        tmp_path.replace(out_path)
+    finally:
+        tmp_path.unlink(missing_ok=True)
+    return out_path, status
+
+
+def extract_pdf_pages(pdf_path: Path) -> list[dict]:
+    """
+    逐頁擷取 PDF 文字。每頁的快取鍵由內容串流加上遞迴解析後的
+    /Resources（字型含 ToUnicode、Form XObject 等）與擷取器版本組成，
+    只有快取中沒有的頁面才會送進 ProcessPool 擷取；
+    回傳 [{"page": 頁碼, "hash": 頁面 hash}, ...]。
+    """
+    try:
+        import pypdf
+        from pypdf import PdfReader
+    except ImportError:
+        raise RuntimeError("需要安裝 pypdf：pip install pypdf")
+
+    extractor = f"pypdf-{pypdf.__version__}/r{PDF_EXTRACTOR_REV}".encode()
+    reader = PdfReader(pdf_path)
+    memo = {}      # 間接物件 → digest（同一份 PDF 內共用的字型只算一次）
+    pages = []
+    missing = {}   # hash → 頁面索引（內容相同的頁面只擷取一次）
+    hits = 0
+    for i, page in enumerate(reader.pages):
+        h = hashlib.md5(extractor)
+        for key in ("/Contents", "/Resources", "/Rotate"):
+            h.update(key.encode())
+            if key in page:
+                h.update(pdf_object_digest(page.raw_get(key), memo))
+        h = h.hexdigest()
+        pages.append({"page": i + 1, "hash": h})
+        if (PAGE_CACHE_DIR / f"{h}.txt").exists():
+            hits += 1
+        elif h not in missing:
+            missing[h] = i
+
+    print(f"  → PDF {len(pages)} 頁，快取命中 {hits} 頁，需擷取 {len(missing)} 頁")
+    if not missing:
+        return pages
+
+    PAGE_CACHE_DIR.mkdir(parents=True, exist_ok=True)
+    indices = sorted(missing.values())
+    batches = [indices[i:i + PDF_PAGE_BATCH] for i in range(0, len(indices), PDF_PAGE_BATCH)]
+
+    # 每批擷取完立即寫入快取，不在記憶體中累積整份文字
+    if len(batches) == 1:
+        save_page_texts(pages, extract_page_batch(str(pdf_path), batches[0]))
+    else:
+        with ProcessPoolExecutor(max_workers=PDF_WORKERS) as pool:
+            futures = [pool.submit(extract_page_batch, str(pdf_path), b) for b in batches]
+            for fut in as_completed(futures):
+                save_page_texts(pages, fut.result())
+    return pages
+
+
+def pdf_object_digest(obj, memo: dict) -> bytes:
+    """
+    遞迴計算 PDF 物件的 digest：間接參照會解析（以 memo 處理共用與循環參照），
+    stream 納入解碼後的內容；影像 stream 不影響文字擷取，只計字典。
+    """
+    from pypdf.generic import ArrayObject, DictionaryObject, IndirectObject, StreamObject
+
+    if isinstance(obj, IndirectObject):
+        ref = (obj.idnum, obj.generation)
+        if ref not in memo:
+            memo[ref] = f"ref {ref}".encode()   # 循環參照時的佔位值
+            memo[ref] = pdf_object_digest(obj.get_object(), memo)
+        return memo[ref]
+
+    h = hashlib.md5(type(obj).__name__.encode())
+    if isinstance(obj, StreamObject) and obj.get("/Subtype") != "/Image":
+        h.update(obj.get_data())
+    if isinstance(obj, DictionaryObject):
+        for key in sorted(obj):
+            h.update(key.encode())
+            h.update(pdf_object_digest(obj.raw_get(key), memo))
+    elif isinstance(obj, ArrayObject):
+        for item in obj:
+            h.update(pdf_object_digest(item, memo))
+    else:
+        h.update(repr(obj).encode())
+    return h.digest()
+
+
+def extract_page_batch(pdf_path: str, indices: list[int]) -> list[tuple[int, str]]:
+    """ProcessPool worker：開啟 PDF 並擷取指定頁面的文字（段落以空行分隔）"""
+    from pypdf import PdfReader
+
+    reader = PdfReader(pdf_path)
+    out = []
+    for i in indices:
+        raw = reader.pages[i].extract_text() or ""
+        paragraphs = [clean_text(p) for p in re.split(r"\n\s*\n", raw)]
+        out.append((i, "\n\n".join(p for p in paragraphs if p)))
+    return out
 
 
 def clean_text(text: str) -> str:
@@ -199,6 +455,25 @@ def load_sources() -> list:
     return data.get("sources", [])
 
 
+def save_page_texts(pages: list[dict], batch: list[tuple[int, str]]):
+    for i, text in batch:
+        (PAGE_CACHE_DIR / f"{pages[i]['hash']}.txt").write_text(text, encoding="utf-8")
+
+
+def load_rss_state(sid: str) -> list[dict]:
+    state_path = RSS_STATE_DIR / f"{sid}.json"
+    if state_path.exists():
+        with open(state_path, encoding="utf-8") as f:
+            return json.load(f).get("items", [])
+    return []
+
+
+def save_rss_state(sid: str, items: list[dict]):
+    RSS_STATE_DIR.mkdir(parents=True, exist_ok=True)
+    with open(RSS_STATE_DIR / f"{sid}.json", "w", encoding="utf-8") as f:
+        json.dump({"items": items}, f, ensure_ascii=False, indent=2)
+
+
 def save_raw(sid: str, result: dict):
     RAW_DIR.mkdir(parents=True, exist_ok=True)
     out_path = RAW_DIR / f"{sid}.json"
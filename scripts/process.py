@@ -13,6 +13,7 @@ import argparse
 import hashlib
 import json
 import re
+from collections.abc import Iterator
 from datetime import datetime, timezone
 from pathlib import Path
 
@@ -20,6 +21,7 @@ from pathlib import Path
 ROOT = Path(__file__).parent.parent
 RAW_DIR = ROOT / "data" / "raw"
 PROCESSED_DIR = ROOT / "data" / "processed"
+PAGE_CACHE_DIR = ROOT / "data" / ".pdf_page_cache"   # ingest.py 寫入的 PDF 每頁文字
 
 CHUNK_MAX_TOKENS = 350      # 每個 chunk 約多少 token（粗估：1 token ≈ 1.5 字元）
 CHUNK_OVERLAP = 50          # 前後 chunk 重疊字元數（保持語義連貫）
@@ -48,8 +50,11 @@ def main():
         license_ = raw.get("license", "public_summary")
 
         # restricted 來源不切 chunk，直接生成單一 reference 記錄
+        new_count = None
         if license_ == "restricted":
             chunks = [make_reference_chunk(raw)]
+        elif "items" in raw:
+            chunks, new_count = chunk_rss_items(raw)
         else:
             chunks = chunk_document(raw)
 
@@ -78,7 +83,10 @@ def main():
         with open(out_path, "w", encoding="utf-8") as f:
             json.dump(out, f, ensure_ascii=False, indent=2)
 
-        print(f"  ✓ {sid}: {len(unique_chunks)} chunks")
+        if new_count is not None:
+            print(f"  ✓ {sid}: {len(unique_chunks)} chunks（新增 {new_count}）")
+        else:
+            print(f"  ✓ {sid}: {len(unique_chunks)} chunks")
 
     print(f"\n下一步：python scripts/build_index.py")
 
@@ -90,53 +98,116 @@ def chunk_document(raw: dict) -> list[dict]:
     1. 先依段落（空行）切分
     2. 若段落仍太長，再依句子切分
     3. 若段落太短，合併相鄰段落
+    PDF 來源逐頁從頁面快取讀入段落，不一次載入整份文字。
     """
-    text = raw.get("text", "")
-    if not text:
-        return []
+    if "pages" in raw:
+        paragraphs = iter_pdf_paragraphs(raw)
+    else:
+        text = raw.get("text", "")
+        if not text:
+            return []
+        paragraphs = (p.strip() for p in re.split(r"\n{2,}", text) if p.strip())
+
+    # 過濾太短、建立 chunk 物件（total 在切完後回填）
+    chunks = []
+    total = 0
+    for i, seg in enumerate(iter_segments(paragraphs)):
+        total = i + 1
+        if len(seg) < MIN_CHUNK_CHARS:
+            continue
+        chunks.append(make_chunk(raw, seg, i, 0))
+    for c in chunks:
+        c["total_chunks"] = total
+
+    return chunks
 
-    # 依段落切分
-    paragraphs = [p.strip() for p in re.split(r"\n{2,}", text) if p.strip()]
 
-    # 合併過短的段落
-    merged = []
+def iter_segments(paragraphs) -> Iterator[str]:
+    """合併過短的段落，超長的再依句子切分；逐段產出"""
     buf = ""
     for para in paragraphs:
         if len(buf) + len(para) < CHUNK_MAX_TOKENS * 1.5:
             buf = (buf + " " + para).strip()
         else:
             if buf:
-                merged.append(buf)
+                yield from split_segment(buf)
             buf = para
     if buf:
-        merged.append(buf)
+        yield from split_segment(buf)
 
-    # 若合併後仍超長，再切一刀
-    final_segments = []
-    for seg in merged:
-        if token_estimate(seg) <= CHUNK_MAX_TOKENS:
-            final_segments.append(seg)
+
+def split_segment(seg: str) -> Iterator[str]:
+    if token_estimate(seg) <= CHUNK_MAX_TOKENS:
+        yield seg
+        return
+
+    # 依句子切分
+    sentences = re.split(r"(?<=[。？！.!?])\s*", seg)
+    sub_buf = ""
+    for sent in sentences:
+        if token_estimate(sub_buf + sent) > CHUNK_MAX_TOKENS and sub_buf:
+            yield sub_buf.strip()
+            sub_buf = sent
         else:
-            # 依句子切分
-            sentences = re.split(r"(?<=[。？！.!?])\s*", seg)
-            sub_buf = ""
-            for sent in sentences:
-                if token_estimate(sub_buf + sent) > CHUNK_MAX_TOKENS and sub_buf:
-                    final_segments.append(sub_buf.strip())
-                    sub_buf = sent
-                else:
-                    sub_buf += " " + sent
-            if sub_buf.strip():
-                final_segments.append(sub_buf.strip())
-
-    # 過濾太短、建立 chunk 物件
-    chunks = []
-    for i, seg in enumerate(final_segments):
-        if len(seg) < MIN_CHUNK_CHARS:
+            sub_buf += " " + sent
+    if sub_buf.strip():
+        yield sub_buf.strip()
+
+
+def iter_pdf_paragraphs(raw: dict) -> Iterator[str]:
+    """依頁序從頁面快取讀出段落"""
+    for page in raw["pages"]:
+        page_path = PAGE_CACHE_DIR / f"{page['hash']}.txt"
+        if not page_path.exists():
+            print(f"  [WARN] {raw['id']} 第 {page['page']} 頁缺少快取，請重新執行 ingest.py")
             continue
-        chunks.append(make_chunk(raw, seg, i, len(final_segments)))
+        text = page_path.read_text(encoding="utf-8")
+        for p in re.split(r"\n{2,}", text):
+            if p.strip():
+                yield p.strip()
 
-    return chunks
+
+def chunk_rss_items(raw: dict) -> tuple[list[dict], int]:
+    """
+    RSS 來源：每則 item 一個 chunk，id 由 guid 決定（不隨位置改變）。
+    item 記錄自 first_seen 起就不再變動，所以舊 item 產生的 chunk 內容不變；
+    first_seen 等於本次 fetched_at 的才算新項目。回傳 (chunks, 新增數)。
+    """
+    chunks = []
+    new_count = 0
+    for item in raw.get("items", []):
+        chunk = make_item_chunk(raw, item)
+        if not chunk["text"]:
+            continue
+        chunks.append(chunk)
+        if item.get("first_seen") == raw.get("fetched_at"):
+            new_count += 1
+    return chunks, new_count
+
+
+def make_item_chunk(raw: dict, item: dict) -> dict:
+    lines = [item.get("title", "")]
+    if item.get("published"):
+        lines.append(f"發布：{item['published']}")
+    if item.get("summary"):
+        lines.append(item["summary"])
+    text = "\n".join(l for l in lines if l).strip()
+    return {
+        "id": f"{raw['id']}_i{hashlib.md5(item['guid'].encode('utf-8')).hexdigest()[:10]}",
+        "source_id": raw["id"],
+        "title": f"{raw['title']}：{item['title']}" if item.get("title") else raw["title"],
+        "url": item.get("link") or raw["url"],
+        "date": extract_date(item.get("first_seen") or raw.get("fetched_at", "")),
+        "category": raw.get("category"),
+        "language": raw.get("language"),
+        "tags": raw.get("tags", []),
+        "license": raw.get("license"),
+        "chunk_index": 0,
+        "total_chunks": 1,
+        "text": text[:CHUNK_MAX_TOKENS * 2],
+        "token_estimate": token_estimate(text),
+        "hash": hashlib.md5(text.encode("utf-8")).hexdigest()[:12],
+    }
 
 
 def make_chunk(raw: dict, text: str, idx: int, total: int) -> dict:
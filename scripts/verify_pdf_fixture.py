@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+scripts/verify_pdf_fixture.py
+離線驗證 PDF 路徑：用 data/fixtures/ 的範例 PDF 跑 ingest → process，
+頁面快取寫到暫存目錄，不影響 data/
+
+範例 PDF 每頁的內容串流都是同一個 `q /Fm0 Do Q`，文字放在各自的
+Form XObject；第 5 頁與第 1 頁共用同一個 Form，應得到相同的頁面 hash。
+PDF_PAGE_BATCH 設為 1，讓 4 個待擷取頁面分成多批，走 ProcessPool 路徑。
+"""
+import sys, tempfile
+from pathlib import Path
+
+import ingest
+import process
+
+ROOT = Path(__file__).resolve().parent.parent
+FIXTURE = ROOT / "data" / "fixtures" / "form_xobject_sample.pdf"
+EXPECTED = ["Fixture page 1", "Fixture page 2", "Fixture page 3", "Fixture page 4", "Fixture page 1"]
+
+
+class CountingPool(ingest.ProcessPoolExecutor):
+    """記錄送進 ProcessPool 的批次數，確認真的走平行擷取路徑"""
+    submitted = 0
+
+    def submit(self, *args, **kwargs):
+        CountingPool.submitted += 1
+        return super().submit(*args, **kwargs)
+
+
+def main():
+    errors = []
+    ingest.ProcessPoolExecutor = CountingPool
+
+    with tempfile.TemporaryDirectory() as tmp:
+        ingest.PAGE_CACHE_DIR = process.PAGE_CACHE_DIR = Path(tmp)
+        ingest.PDF_PAGE_BATCH = 1
+        source = {
+            "id": "fixture_pdf",
+            "title": "Fixture PDF",
+            "url": str(FIXTURE.relative_to(ROOT)),
+            "type": "pdf",
+            "license": "public",
+        }
+
+        # 第一次：冷快取，每個不同的頁面都要擷取
+        try:
+            raw = ingest.fetch_source(source)
+            hashes = [p["hash"] for p in raw["pages"]]
+            assert len(hashes) == 5, f"頁數 {len(hashes)} != 5"
+            assert len(set(hashes)) == 4, f"不同頁面 hash 數 {len(set(hashes))} != 4"
+            assert hashes[0] == hashes[4], "第 1、5 頁內容相同，hash 應相同"
+            assert CountingPool.submitted == 4, f"ProcessPool 批次數 {CountingPool.submitted} != 4"
+            for page, expected in zip(raw["pages"], EXPECTED):
+                text = (Path(tmp) / f"{page['hash']}.txt").read_text(encoding="utf-8")
+                assert text.startswith(expected), f"第 {page['page']} 頁文字錯誤：{text[:40]!r}"
+            print("✓ 冷快取：5 頁、4 個不同 hash，4 批經 ProcessPool 擷取，各頁文字正確")
+        except Exception as e:
+            errors.append(f"冷快取：{e}")
+
+        # 第二次：file:// URL，全部命中快取，不應重寫任何快取檔
+        try:
+            before = {p.name: p.stat().st_mtime_ns for p in Path(tmp).iterdir()}
+            raw = ingest.fetch_source({**source, "url": FIXTURE.as_uri()})
+            after = {p.name: p.stat().st_mtime_ns for p in Path(tmp).iterdir()}
+            assert before == after, "快取命中時不應重新擷取"
+            print("✓ 熱快取：file:// 來源全部命中，未重新擷取")
+        except Exception as e:
+            errors.append(f"熱快取：{e}")
+
+        # process：逐頁讀快取切 chunk
+        try:
+            chunks = process.chunk_document(raw)
+            joined = " ".join(c["text"] for c in chunks)
+            assert chunks, "沒有產生 chunk"
+            for expected in EXPECTED[:4]:
+                assert expected in joined, f"chunk 缺少 {expected}"
+            print(f"✓ process：{len(chunks)} chunks")
+        except Exception as e:
+            errors.append(f"process：{e}")
+
+    if errors:
+        for e in errors:
+            print(f"✗ {e}", file=sys.stderr)
+        sys.exit(1)
+    else:
+        print("\n✅ PDF 離線驗證通過")
+
+
+# ProcessPool 在 spawn 模式下會重新 import 主模組，必須有這個保護
+if __name__ == "__main__":
+    main()